@@ -1,28 +1,78 @@
-"""Main Flask application for Plex Dubs webhook handler."""
+"""Main Quart application for Plex Dubs webhook handler."""
 
-from flask import request
-from src.config import app, ensure_file_exists
+import asyncio
+import threading
+
+from quart import request
+from src.config import app, executor, shutting_down, warm_up_plex, PlexNotReady
+from src.logger import log_warning
 from src.sonarr import sonarr_webhook
 from src.radarr import radarr_webhook
+from src.shared import clear_plex_caches
+
+
+@app.before_serving
+async def use_worker_pool() -> None:
+    """Run blocking work handed to asyncio.to_thread on the bounded worker pool."""
+    asyncio.get_running_loop().set_default_executor(executor)
 
-ensure_file_exists("/tmp/deleted_media_ids.txt")
+
+@app.before_serving
+async def connect_plex() -> None:
+    """Connect to Plex in the background so the server can bind immediately.
+
+    The warm-up gets its own daemon thread, so its backoff neither occupies a
+    worker in the shared pool nor holds up shutdown.
+    """
+    threading.Thread(target=warm_up_plex, name='plexdubs-warmup', daemon=True).start()
+
+
+@app.after_serving
+async def stop_plex_retries() -> None:
+    """Cut short any wait between Plex connection attempts so shutdown is not held up."""
+    shutting_down.set()
+
+
+@app.errorhandler(PlexNotReady)
+async def handle_plex_not_ready(error: PlexNotReady) -> tuple[str, int]:
+    """Answer with 503 while Plex is unreachable so the sender retries later.
+
+    Args:
+        error: Reason Plex could not be reached.
+
+    Returns:
+        Tuple of (response message, status code).
+    """
+    log_warning(app.logger, "plex_unavailable", path=request.path, reason=str(error))
+    return "Plex unavailable", 503
 
 
 @app.route('/sonarr', methods=['POST'])
-def handle_sonarr() -> tuple[str, int]:
+async def handle_sonarr() -> tuple[str, int]:
     """Handle Sonarr webhook requests.
 
     Returns:
         Tuple of (response message, status code).
     """
-    return sonarr_webhook(request)
+    return await sonarr_webhook(request)
 
 
 @app.route('/radarr', methods=['POST'])
-def handle_radarr() -> tuple[str, int]:
+async def handle_radarr() -> tuple[str, int]:
     """Handle Radarr webhook requests.
 
     Returns:
         Tuple of (response message, status code).
     """
-    return radarr_webhook(request)
+    return await radarr_webhook(request)
+
+
+@app.route('/admin/reload', methods=['POST'])
+async def handle_reload() -> tuple[str, int]:
+    """Drop cached Plex library sections and listings, e.g. after renaming a library.
+
+    Returns:
+        Tuple of (response message, status code).
+    """
+    clear_plex_caches()
+    return "Caches cleared", 200
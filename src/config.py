@@ -4,22 +4,35 @@ from __future__ import annotations
 
 import os
 import sys
+import asyncio
+import atexit
 import logging
+import random
+import threading
 import time
-
-from flask import Flask
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import requests
+from quart import Quart
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from plexapi.exceptions import BadRequest, Unauthorized  # type: ignore[import-untyped]
+from plexapi.library import LibrarySection  # type: ignore[import-untyped]
 from plexapi.server import PlexServer  # type: ignore[import-untyped]
 from urllib.parse import urlparse
 
-app: Flask = Flask(__name__)
+from .logger import KeyValueFormatter, log_error, log_event, log_warning
+
+app: Quart = Quart(__name__)
 
-# Remove Flask's default handler
+# Remove Quart's default handler
 for handler in app.logger.handlers:
     app.logger.removeHandler(handler)
 
 # Set up custom logging with ISO 8601 timestamps
 log_handler: logging.Handler = logging.StreamHandler()
-log_formatter = logging.Formatter(
+log_formatter = KeyValueFormatter(
     fmt='[%(asctime)s] %(levelname)-5s %(module)s.%(message)s',
     datefmt='%Y-%m-%dT%H:%M:%S'
 )
@@ -28,87 +41,142 @@ app.logger.addHandler(log_handler)
 app.logger.setLevel(logging.INFO)
 
 
-def ensure_file_exists(file_path: str) -> None:
-    """Ensure a file exists, creating it if it doesn't.
+def is_valid_url(url: str) -> bool:
+    """Check if a URL is valid.
 
     Args:
-        file_path: Path to the file to ensure exists.
+        url: URL to validate.
+
+    Returns:
+        True if URL is valid, False otherwise.
     """
-    if not os.path.exists(file_path):
-        with open(file_path, 'a'):
-            pass
+    parsed = urlparse(url)
+    return all([parsed.scheme, parsed.netloc])
 
 
-def get_env_variable(
-    var_name: str,
-    default: str | None = None,
-    required: bool = True,
-    errors: list[str] | None = None
-) -> str | None:
-    """Retrieve an environment variable with validation.
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Application settings, validated once when created."""
+
+    plex_url: str
+    plex_token: str
+    sonarr_library: str | None = None
+    radarr_library: str | None = None
+    max_collection_size: int = 100
+    max_date_diff: int = 4
+    worker_threads: int = 8
+
+    def __post_init__(self) -> None:
+        """Validate the settings.
+
+        Raises:
+            ValueError: If a required setting is missing or invalid.
+        """
+        if not self.plex_url:
+            raise ValueError("The PLEX_URL environment variable is required.")
+        if not is_valid_url(self.plex_url):
+            raise ValueError(f"Invalid PLEX_URL: {self.plex_url}")
+        if not self.plex_token:
+            raise ValueError("The PLEX_TOKEN environment variable is required.")
+        if not self.sonarr_library and not self.radarr_library:
+            raise ValueError("At least one of PLEX_ANIME_SERIES or PLEX_ANIME_MOVIES environment variables is required.")
+        if self.max_collection_size < 1:
+            raise ValueError(f"MAX_COLLECTION_SIZE must be at least 1, got {self.max_collection_size}")
+        if self.worker_threads < 1:
+            raise ValueError(f"WORKER_THREADS must be at least 1, got {self.worker_threads}")
+
+    @classmethod
+    def from_env(cls) -> Config:
+        """Build the settings from environment variables.
+
+        Returns:
+            Validated Config instance.
+
+        Raises:
+            ValueError: If a setting is missing or not a valid value.
+        """
+        return cls(
+            plex_url=os.getenv('PLEX_URL', ''),
+            plex_token=os.getenv('PLEX_TOKEN', ''),
+            sonarr_library=os.getenv('PLEX_ANIME_SERIES') or None,
+            radarr_library=os.getenv('PLEX_ANIME_MOVIES') or None,
+            max_collection_size=int(os.getenv('MAX_COLLECTION_SIZE') or 100),
+            max_date_diff=int(os.getenv('MAX_DATE_DIFF') or 4),
+            worker_threads=int(os.getenv('WORKER_THREADS') or 8),
+        )
+
+
+try:
+    cfg: Config = Config.from_env()
+except ValueError as e:
+    log_error(app.logger, "config_error", exception=str(e))
+    sys.exit(1)
 
-    Args:
-        var_name: Name of the environment variable.
-        default: Default value if not found.
-        required: Whether the variable is required.
-        errors: List to append error messages to.
 
-    Returns:
-        The environment variable value or default.
-    """
-    if errors is None:
-        errors = []
-
-    value: str | None = os.getenv(var_name, default)
-    if required and (value is None or value == ''):
-        errors.append(f"Error: The {var_name} environment variable is required.")
-    return value
-
-
-# List to collect environment variable errors
-env_errors: list[str] = []
-
-# Get environment variables
-SONARR_LIBRARY: str | None = get_env_variable('PLEX_ANIME_SERIES', required=False, errors=env_errors)
-RADARR_LIBRARY: str | None = get_env_variable('PLEX_ANIME_MOVIES', required=False, errors=env_errors)
-PLEX_URL: str | None = get_env_variable('PLEX_URL', required=True, errors=env_errors)
-PLEX_TOKEN: str | None = get_env_variable('PLEX_TOKEN', required=True, errors=env_errors)
-MAX_COLLECTION_SIZE: int = int(get_env_variable('MAX_COLLECTION_SIZE', default='100', required=False, errors=env_errors) or '100')
-MAX_DATE_DIFF: int = int(get_env_variable('MAX_DATE_DIFF', default='4', required=False, errors=env_errors) or '4')
-
-# Validate that at least one of SONARR_LIBRARY or RADARR_LIBRARY is provided
-if not SONARR_LIBRARY and not RADARR_LIBRARY:
-    env_errors.append("Error: At least one of PLEX_ANIME_SERIES or PLEX_ANIME_MOVIES environment variables is required.")
-
-# Check for environment variable errors
-if env_errors:
-    for error in env_errors:
-        app.logger.error(f"config_error\n  error={error}")
-    sys.exit(1)
+# Size of the HTTP connection pool shared by all Plex requests
+PLEX_POOL_SIZE: int = 32
+# Timeout in seconds for individual Plex requests
+PLEX_TIMEOUT: int = 10
 
 
-def is_valid_url(url: str) -> bool:
-    """Check if a URL is valid.
+def create_plex_session(pool_size: int = PLEX_POOL_SIZE) -> requests.Session:
+    """Create an HTTP session with a connection pool for Plex requests.
+
+    Idempotent requests are retried with backoff on connection errors and 5xx
+    responses, so a briefly unavailable Plex (or proxy in front of it) does
+    not fail the webhook.
 
     Args:
-        url: URL to validate.
+        pool_size: Maximum number of pooled connections per host.
 
     Returns:
-        True if URL is valid, False otherwise.
+        Configured requests Session.
     """
-    parsed = urlparse(url)
-    return all([parsed.scheme, parsed.netloc])
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'}),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # Hand the last response to plexapi so it raises BadRequest
+    )
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
 
-# Validate PLEX_URL
-if PLEX_URL and not is_valid_url(PLEX_URL):
-    app.logger.error(f"invalid_url\n  url={PLEX_URL}")
-    sys.exit(1)
+# Shared session so every Plex call reuses keep-alive connections
+plex_session: requests.Session = create_plex_session()
+
+# Bounded pool for blocking Plex work, installed as the event loop's default executor
+executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=cfg.worker_threads, thread_name_prefix='plexdubs')
+atexit.register(executor.shutdown)
+
+
+# Cap in seconds for a single wait between Plex connection attempts
+MAX_RETRY_DELAY: int = 60
+# Cap in seconds for the combined wait across all Plex connection attempts
+MAX_TOTAL_WAIT: int = 300
+
+# Errors that suggest Plex is still starting up or unreachable, and worth retrying
+RETRYABLE_ERRORS: tuple[type[Exception], ...] = (requests.ConnectionError, requests.Timeout, BadRequest)
+
+
+# Connection attempts made by the startup warm-up
+PLEX_CONNECT_RETRIES: int = 10
 
+# Set on shutdown to cut short any wait between Plex connection attempts
+shutting_down: threading.Event = threading.Event()
 
-def connect_to_plex(url: str, token: str, max_retries: int = 6) -> PlexServer:
+
+def connect_to_plex(url: str, token: str, max_retries: int = PLEX_CONNECT_RETRIES) -> PlexServer:
     """Connect to Plex server with retry logic.
 
+    Waits between attempts grow exponentially up to MAX_RETRY_DELAY, with
+    random jitter, and stop once MAX_TOTAL_WAIT would be exceeded.
+
     Args:
         url: Plex server URL.
         token: Plex authentication token.
@@ -118,31 +186,148 @@ def connect_to_plex(url: str, token: str, max_retries: int = 6) -> PlexServer:
         Connected PlexServer instance.
 
     Raises:
-        Exception: If connection fails after all retries.
+        PlexNotReady: If the server starts shutting down while waiting to retry.
+        Exception: If connection fails after all retries, or with an error that is not retryable.
     """
-    retry_delay: int = 5  # seconds
+    retry_delay: float = 5  # seconds
+    deadline: float = time.monotonic() + MAX_TOTAL_WAIT
     last_exception: Exception | None = None
+    attempt: int = 0
 
-    for attempt in range(max_retries):
+    for attempt in range(1, max_retries + 1):
         try:
-            plex_server: PlexServer = PlexServer(url, token)
-            app.logger.info(f"plex_connected\n  url={url}")
+            plex_server: PlexServer = PlexServer(url, token, session=plex_session, timeout=PLEX_TIMEOUT)
+            log_event(app.logger, "plex_connected", url=url)
             return plex_server
-        except Exception as e:
+        except Unauthorized as e:
+            # A bad token will not fix itself, so fail fast
+            log_error(app.logger, "plex_unauthorized", exception=str(e), url=url)
+            raise
+        except RETRYABLE_ERRORS as e:
             last_exception = e
-            if attempt < max_retries - 1:
-                app.logger.warning(f"plex_connection_retry\n  attempt={attempt + 1} max_retries={max_retries} retry_in={retry_delay}s")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
+            wait: float = retry_delay + random.uniform(0, retry_delay * 0.25)
+            if attempt == max_retries or time.monotonic() + wait > deadline:
+                break
+            log_warning(
+                app.logger, "plex_connection_retry",
+                attempt=attempt, max_retries=max_retries, retry_in=f"{wait:.1f}s"
+            )
+            if shutting_down.wait(wait):
+                raise PlexNotReady("Server is shutting down")
+            retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY)  # Exponential backoff
+        except Exception as e:
+            log_error(app.logger, "plex_connection_failed", exception=str(e), attempts=attempt)
+            raise
 
     # If we get here, all retries failed
-    app.logger.error(f"plex_connection_failed\n  error={str(last_exception)} attempts={max_retries}")
+    log_error(app.logger, "plex_connection_failed", exception=str(last_exception), attempts=attempt)
     raise last_exception or Exception("Failed to connect to Plex server")
 
 
-# Ensure PLEX_URL and PLEX_TOKEN are not None before connecting
-if PLEX_URL is None or PLEX_TOKEN is None:
-    app.logger.error("config_error\n  error=PLEX_URL or PLEX_TOKEN not set")
-    sys.exit(1)
+class PlexNotReady(Exception):
+    """Raised when the Plex server cannot be reached (yet)."""
+
+
+# Shared Plex connection, created on first use by get_plex()
+_plex: PlexServer | None = None
+_plex_lock = threading.Lock()
+
+
+def get_plex(max_retries: int = 1) -> PlexServer:
+    """Return the shared Plex connection, connecting on first use.
 
-plex: PlexServer = connect_to_plex(PLEX_URL, PLEX_TOKEN)
+    Only one caller connects at a time; anyone arriving while a connection
+    attempt is underway gets PlexNotReady instead of waiting out its backoff.
+
+    Args:
+        max_retries: Maximum number of connection attempts if not yet connected.
+
+    Returns:
+        Connected PlexServer instance.
+
+    Raises:
+        PlexNotReady: If Plex is unreachable or a connection attempt is in progress.
+    """
+    global _plex
+    if _plex is not None:
+        return _plex
+
+    if not _plex_lock.acquire(blocking=False):
+        raise PlexNotReady("Connection to Plex is in progress")
+    try:
+        if _plex is None:
+            try:
+                _plex = connect_to_plex(cfg.plex_url, cfg.plex_token, max_retries=max_retries)
+            except Exception as e:
+                raise PlexNotReady(str(e)) from e
+        return _plex
+    finally:
+        _plex_lock.release()
+
+
+async def ensure_plex() -> PlexServer:
+    """Return the shared Plex connection, using a worker thread only to connect.
+
+    Once connected, or while another caller is connecting, this answers on the
+    event loop, so a busy worker pool cannot hold up the readiness check.
+
+    Returns:
+        Connected PlexServer instance.
+
+    Raises:
+        PlexNotReady: If Plex is unreachable or a connection attempt is in progress.
+    """
+    if _plex is not None:
+        return _plex
+    if _plex_lock.locked():
+        raise PlexNotReady("Connection to Plex is in progress")
+    return await asyncio.to_thread(get_plex)
+
+
+# Seconds a resolved library section is reused before looking it up again
+SECTION_TTL: int = 60
+
+# Library name -> (lookup time, section)
+_sections: dict[str, tuple[float, LibrarySection]] = {}
+_sections_lock = threading.Lock()
+
+
+def get_section(name: str) -> LibrarySection:
+    """Return a Plex library section by name, cached for SECTION_TTL seconds.
+
+    Args:
+        name: Name of the Plex library section.
+
+    Returns:
+        The matching LibrarySection.
+
+    Raises:
+        PlexNotReady: If Plex cannot be reached.
+    """
+    with _sections_lock:
+        entry = _sections.get(name)
+        if entry and time.monotonic() - entry[0] < SECTION_TTL:
+            return entry[1]
+
+    section: LibrarySection = get_plex().library.section(name)
+    with _sections_lock:
+        _sections[name] = (time.monotonic(), section)
+    return section
+
+
+def clear_section_cache() -> None:
+    """Drop all cached library sections."""
+    with _sections_lock:
+        _sections.clear()
+
+
+def warm_up_plex() -> None:
+    """Connect to Plex with the full retry schedule without raising on failure.
+
+    Meant to run in the background at startup, so the server can accept
+    webhooks while Plex is still coming up.
+    """
+    try:
+        get_plex(max_retries=PLEX_CONNECT_RETRIES)
+    except PlexNotReady:
+        pass  # Already logged by connect_to_plex; webhooks will try again on demand
@@ -2,8 +2,42 @@
 
 from __future__ import annotations
 
-from typing import Any
-from logging import Logger
+from typing import Any, Callable
+from logging import Formatter, Logger, LogRecord
+
+
+def _format_str(value: str) -> str:
+    """Format a string for key-value logging.
+
+    Args:
+        value: String to format.
+
+    Returns:
+        The string, quoted if it contains spaces or '='.
+    """
+    return ('"' + value + '"') if (' ' in value or '=' in value) else value
+
+
+def _format_bool(value: bool) -> str:
+    """Format a boolean for key-value logging.
+
+    Args:
+        value: Boolean to format.
+
+    Returns:
+        'true' or 'false'.
+    """
+    return 'true' if value else 'false'
+
+
+# Formatters keyed by exact type; anything else falls back to str()
+_FORMATTERS: dict[type, Callable[[Any], str]] = {
+    str: _format_str,
+    bool: _format_bool,
+    type(None): lambda _: 'null',
+    int: str,
+    float: str,
+}
 
 
 def _format_value(value: Any) -> str:
@@ -15,17 +49,8 @@ def _format_value(value: Any) -> str:
     Returns:
         Formatted string representation.
     """
-    if isinstance(value, str):
-        # Quote strings that contain spaces
-        if ' ' in value or '=' in value:
-            return f'"{value}"'
-        return value
-    elif isinstance(value, bool):
-        return str(value).lower()
-    elif value is None:
-        return 'null'
-    else:
-        return str(value)
+    formatter = _FORMATTERS.get(type(value))
+    return formatter(value) if formatter is not None else str(value)
 
 
 def _format_kv_pairs(**kwargs: Any) -> str:
@@ -37,8 +62,35 @@ def _format_kv_pairs(**kwargs: Any) -> str:
     Returns:
         Formatted string of key=value pairs.
     """
-    pairs = [f"{key}={_format_value(value)}" for key, value in kwargs.items()]
-    return ' '.join(pairs)
+    return ' '.join(f"{key}={_format_value(value)}" for key, value in kwargs.items())
+
+
+class KeyValueFormatter(Formatter):
+    """Formatter that appends structured data passed as ``extra={'kv': ...}``.
+
+    The key-value pairs are only rendered when a record is actually emitted,
+    so log calls below the active level cost no string formatting.
+    """
+
+    def formatMessage(self, record: LogRecord) -> str:
+        """Format a record, appending its key-value pairs to the message.
+
+        Args:
+            record: Log record whose message has already been resolved.
+
+        Returns:
+            Formatted log line.
+        """
+        data: dict[str, Any] | None = getattr(record, 'kv', None)
+        if not data:
+            return super().formatMessage(record)
+
+        message: str = record.message
+        record.message = f"{message}\n  {_format_kv_pairs(**data)}"
+        try:
+            return super().formatMessage(record)
+        finally:
+            record.message = message  # Leave the record as other handlers expect it
 
 
 def log_event(logger: Logger, event: str, **data: Any) -> None:
@@ -52,10 +104,7 @@ def log_event(logger: Logger, event: str, **data: Any) -> None:
     Example:
         log_event(logger, "webhook.received", source="sonarr", event="Download")
     """
-    if data:
-        logger.info(f"{event}\n  {_format_kv_pairs(**data)}")
-    else:
-        logger.info(event)
+    logger.info(event, extra={'kv': data})
 
 
 def log_action(logger: Logger, action: str, **data: Any) -> None:
@@ -70,7 +119,7 @@ def log_action(logger: Logger, action: str, **data: Any) -> None:
         log_action(logger, "add_to_collection", media="Show S01E01", status="success")
     """
     data['action'] = action
-    logger.info(f"processing\n  {_format_kv_pairs(**data)}")
+    logger.info("processing", extra={'kv': data})
 
 
 def log_error(logger: Logger, error: str, **data: Any) -> None:
@@ -84,10 +133,7 @@ def log_error(logger: Logger, error: str, **data: Any) -> None:
     Example:
         log_error(logger, "Connection failed", service="plex", attempt=3)
     """
-    if data:
-        logger.error(f"{error}\n  {_format_kv_pairs(**data)}")
-    else:
-        logger.error(error)
+    logger.error(error, extra={'kv': data})
 
 
 def log_warning(logger: Logger, warning: str, **data: Any) -> None:
@@ -101,7 +147,4 @@ def log_warning(logger: Logger, warning: str, **data: Any) -> None:
     Example:
         log_warning(logger, "Retrying connection", attempt=2, max_retries=5)
     """
-    if data:
-        logger.warning(f"{warning}\n  {_format_kv_pairs(**data)}")
-    else:
-        logger.warning(warning)
+    logger.warning(warning, extra={'kv': data})
@@ -3,12 +3,14 @@
 from __future__ import annotations
 
 from typing import Any
-import threading
+import asyncio
 
-from flask import Request
+import orjson
+import requests
+from quart import Request
 from plexapi.video import Movie  # type: ignore[import-untyped]
 
-from .config import app, plex, RADARR_LIBRARY
+from .config import app, cfg, ensure_plex, get_section
 from .logger import log_event, log_action, log_error
 from .shared import (
     is_english_dubbed,
@@ -32,7 +34,7 @@ def get_movie_from_data(LIBRARY_NAME: str, movie_title: str) -> Movie | None:
     """
     log_action(app.logger, "fetch_movie", movie=movie_title, library=LIBRARY_NAME, status="searching")
     try:
-        library = plex.library.section(LIBRARY_NAME)  # type: ignore[no-untyped-call]
+        library = get_section(LIBRARY_NAME)
         fuzzy_result = get_fuzzy_match(library, movie_title)  # type: ignore[arg-type]
 
         if fuzzy_result and isinstance(fuzzy_result, Movie):
@@ -42,27 +44,33 @@ def get_movie_from_data(LIBRARY_NAME: str, movie_title: str) -> Movie | None:
         else:
             log_error(app.logger, "Movie not found", movie=movie_title, library=LIBRARY_NAME)
             return None
+    except requests.ConnectionError as e:
+        log_error(app.logger, "Plex unreachable", exception=str(e), movie=movie_title)
+        return None
     except Exception as e:
         log_error(app.logger, "Error searching for movie", exception=str(e), movie=movie_title)
         return None
 
 
-def radarr_handle_download_event(LIBRARY_NAME: str, movie_name: str) -> None:
+async def radarr_handle_download_event(LIBRARY_NAME: str, movie_name: str) -> None:
     """Handle a download event from Radarr.
 
+    Plex calls are blocking, so they are run in worker threads to keep the
+    event loop free for incoming webhooks.
+
     Args:
         LIBRARY_NAME: Name of the Plex library section.
         movie_name: Name of the movie.
     """
     try:
-        movie: Movie | None = get_movie_from_data(LIBRARY_NAME, movie_name)
+        movie: Movie | None = await asyncio.to_thread(get_movie_from_data, LIBRARY_NAME, movie_name)
         if movie:
-            manage_collection(LIBRARY_NAME, movie, is_movie=True)
+            await asyncio.to_thread(manage_collection, LIBRARY_NAME, movie, is_movie=True)
     except Exception as e:
         log_error(app.logger, "Error processing download event", exception=str(e), library=LIBRARY_NAME)
 
 
-def process_radarr_download_event(
+async def process_radarr_download_event(
     library_name: str,
     movie_title: str,
     movie_id: int,
@@ -77,6 +85,9 @@ def process_radarr_download_event(
         movie_id: Movie ID.
         is_upgrade: Whether this is an upgrade.
         is_recent_release: Whether this is a recent release.
+
+    Raises:
+        PlexNotReady: If Plex cannot be reached, so the webhook is answered with 503.
     """
     if is_upgrade:
         log_action(app.logger, "process_upgrade", movie=movie_title, movie_id=movie_id)
@@ -90,7 +101,8 @@ def process_radarr_download_event(
         )
         return
 
-    threading.Thread(target=radarr_handle_download_event, args=(library_name, movie_title)).start()
+    await ensure_plex()
+    app.add_background_task(radarr_handle_download_event, library_name, movie_title)
 
 
 def radarr_log_webhook(
@@ -123,32 +135,53 @@ def radarr_log_webhook(
     )
 
 
-def radarr_webhook(request: Request) -> tuple[str, int]:
+# Event types that can add to or protect the collection; all others are ignored
+_ACTIONABLE_EVENTS: frozenset[str] = frozenset({'Download', 'MovieFileDelete'})
+
+
+async def radarr_webhook(request: Request) -> tuple[str, int]:
     """Handle incoming Radarr webhook requests.
 
     Args:
-        request: Flask request object.
+        request: Quart request object.
 
     Returns:
         Tuple of (response message, status code).
     """
-    data: dict[str, Any] = request.get_json()
+    try:
+        data: dict[str, Any] = orjson.loads(await request.get_data(cache=False))
+    except orjson.JSONDecodeError as e:
+        log_error(app.logger, "Invalid webhook payload", source="radarr", exception=str(e))
+        return "Invalid JSON", 400
+    if not isinstance(data, dict):
+        log_error(app.logger, "Invalid webhook payload", source="radarr", exception=f"expected an object, got {type(data).__name__}")
+        return "Invalid JSON", 400
+
     event_type: str = data.get('eventType', '')
-    movie_title: str = data.get('movie', {}).get('title', '')
-    movie_id: int = data.get('movie', {}).get('id', 0)
+    if event_type not in _ACTIONABLE_EVENTS:
+        log_action(app.logger, "skip_movie", reason="event not handled", event=event_type)
+        return "Webhook received", 200
+
+    movie: dict[str, Any] = data.get('movie') or {}
+    movie_title: str = movie.get('title', '')
+    movie_id: int = movie.get('id', 0)
+
+    # Skip re-downloads of movies deleted for an upgrade before any further parsing
+    if event_type == 'Download' and was_media_deleted(movie_id):
+        log_action(app.logger, "skip_movie", reason="previous upgrade of dubbed movie", movie_id=movie_id)
+        return "Webhook received", 200
+
     is_dubbed: bool = is_english_dubbed(data)
     is_upgrade: bool = data.get('isUpgrade', False)
-    release_date: str | None = data.get('movie', {}).get('releaseDate')
+    release_date: str | None = movie.get('releaseDate')
     is_recent_release: bool = is_recent_or_upcoming_release(release_date)
 
     radarr_log_webhook(event_type, movie_title, movie_id, release_date, is_dubbed, is_upgrade)
 
     if event_type == 'MovieFileDelete' and data.get('deleteReason') == 'upgrade' and is_dubbed:
         handle_deletion_event(movie_id)
-    elif was_media_deleted(movie_id):
-        log_action(app.logger, "skip_movie", reason="previous upgrade of dubbed movie", movie_id=movie_id)
-    elif event_type == 'Download' and is_dubbed and RADARR_LIBRARY:
-        process_radarr_download_event(RADARR_LIBRARY, movie_title, movie_id, is_upgrade, is_recent_release)
+    elif event_type == 'Download' and is_dubbed and cfg.radarr_library:
+        await process_radarr_download_event(cfg.radarr_library, movie_title, movie_id, is_upgrade, is_recent_release)
     else:
         log_action(app.logger, "skip_movie", reason="does not meet criteria", event=event_type, dubbed=is_dubbed)
 
@@ -2,18 +2,28 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Iterable, Sequence
+from collections import deque
 import datetime
-import fcntl
+import functools
+import os
+import threading
+import time
 
-from rapidfuzz import process
+from rapidfuzz import fuzz, process, utils
+from plexapi.exceptions import NotFound  # type: ignore[import-untyped]
 from plexapi.video import Episode, Movie  # type: ignore[import-untyped]
 from plexapi.library import LibrarySection  # type: ignore[import-untyped]
 
-from .config import app, plex, MAX_COLLECTION_SIZE, MAX_DATE_DIFF
+from .config import app, cfg, clear_section_cache, get_section
 from .logger import log_action, log_warning
 
 
+# Custom formats that mark a release as containing an English dub
+_DUB_FORMATS: frozenset[str] = frozenset({'Anime Dual Audio', 'Dubs Only'})
+_ENG: str = 'eng'
+
+
 def is_english_dubbed(data: dict[str, Any]) -> bool:
     """Check if media is English dubbed based on webhook data.
 
@@ -23,15 +33,80 @@ def is_english_dubbed(data: dict[str, Any]) -> bool:
     Returns:
         True if media is English dubbed, False otherwise.
     """
-    audio_languages: list[str] = data.get('episodeFile', {}).get('mediaInfo', {}).get('audioLanguages', [])
-    if not audio_languages:
-        audio_languages = data.get('movieFile', {}).get('mediaInfo', {}).get('audioLanguages', [])
-    is_dubbed_audio: bool = 'eng' in audio_languages
+    media_file: dict[str, Any] = data.get('movieFile') or data.get('episodeFile') or {}
+    audio_languages: list[str] = media_file.get('mediaInfo', {}).get('audioLanguages', ())
+    if _ENG in audio_languages:
+        return True
+
+    for custom_format in data.get('customFormatInfo', {}).get('customFormats', ()):
+        if custom_format.get('name') in _DUB_FORMATS:
+            return True
+
+    return False
+
+
+# Seconds a cached library listing is reused before fetching it again
+_CACHE_TTL: int = 300
+
+# Section key -> (fetch time, normalized titles, items) for fuzzy matching
+_library_cache: dict[str, tuple[float, tuple[str, ...], tuple[Episode | Movie, ...]]] = {}
+_library_cache_lock = threading.Lock()
+
+
+def _get_library_items(
+    library_section: LibrarySection,
+    refresh: bool = False
+) -> tuple[tuple[str, ...], tuple[Episode | Movie, ...], bool]:
+    """Return the normalized titles and items of a library section, using a short-lived cache.
+
+    Args:
+        library_section: Plex library section to list.
+        refresh: Whether to bypass the cache and fetch from Plex.
+
+    Returns:
+        Tuple of (titles, items, cached) where cached is True if served from the cache.
+    """
+    section_key: str = str(library_section.key)
+    with _library_cache_lock:
+        entry = _library_cache.get(section_key)
+        if not refresh and entry and time.monotonic() - entry[0] < _CACHE_TTL:
+            return entry[1], entry[2], True
+
+    items: tuple[Episode | Movie, ...] = tuple(library_section.all())
+    titles: tuple[str, ...] = tuple(utils.default_process(item.title) for item in items)  # type: ignore[misc]
+    with _library_cache_lock:
+        _library_cache[section_key] = (time.monotonic(), titles, items)
+    return titles, items, False
+
+
+def _best_match(
+    query_title: str,
+    titles: Sequence[str],
+    items: Sequence[Episode | Movie],
+    score_cutoff: int
+) -> Episode | Movie | None:
+    """Return the item whose title best matches the query.
+
+    Args:
+        query_title: Normalized title to search for.
+        titles: Normalized candidate titles, parallel to items.
+        items: Candidate media items.
+        score_cutoff: Minimum score for a match (0-100).
+
+    Returns:
+        The best matching item, or None if no title scores above the cutoff.
+    """
+    result = process.extractOne(query_title, titles, scorer=fuzz.WRatio, processor=None, score_cutoff=score_cutoff)
+    if result is None:
+        return None
+    return items[result[2]]
 
-    custom_formats: list[dict[str, Any]] = data.get('customFormatInfo', {}).get('customFormats', [])
-    is_custom_format: bool = any(cf.get('name') in ['Anime Dual Audio', 'Dubs Only'] for cf in custom_formats)
 
-    return is_dubbed_audio or is_custom_format
+def clear_plex_caches() -> None:
+    """Drop all cached library sections and library listings."""
+    clear_section_cache()
+    with _library_cache_lock:
+        _library_cache.clear()
 
 
 def get_fuzzy_match(
@@ -41,6 +116,9 @@ def get_fuzzy_match(
 ) -> Episode | Movie | None:
     """Find the closest matching media item using fuzzy matching.
 
+    Plex's title search is tried first so only a handful of candidates are
+    scored; the full library listing is only scanned if that finds nothing.
+
     Args:
         library_section: Plex library section to search.
         query_title: Title to search for.
@@ -49,17 +127,23 @@ def get_fuzzy_match(
     Returns:
         The closest matching media item, or None if no match above threshold.
     """
-    items: list[Episode | Movie] = library_section.all()  # type: ignore[assignment]
-    titles: list[str] = [item.title for item in items]  # type: ignore[misc]
+    query: str = utils.default_process(query_title)
+    candidates: list[Episode | Movie] = library_section.search(title=query_title)  # type: ignore[assignment]
+    candidate_titles: list[str] = [utils.default_process(item.title) for item in candidates]  # type: ignore[misc]
+    match = _best_match(query, candidate_titles, candidates, score_cutoff)
 
-    result = process.extractOne(query_title, titles, score_cutoff=score_cutoff)
+    if match is None:
+        titles, items, cached = _get_library_items(library_section)
+        match = _best_match(query, titles, items, score_cutoff)
 
-    if result and result[1] >= score_cutoff:
-        matched_title: str = result[0]
-        return library_section.get(matched_title)
-    else:
+        # Newly added media may be missing from a cached listing, so retry once fresh
+        if match is None and cached:
+            titles, items, _ = _get_library_items(library_section, refresh=True)
+            match = _best_match(query, titles, items, score_cutoff)
+
+    if match is None:
         log_action(app.logger, "fuzzy_match_failed", query=query_title, cutoff=score_cutoff)
-        return None
+    return match
 
 
 def manage_collection(
@@ -77,25 +161,27 @@ def manage_collection(
         is_movie: Whether the media is a movie (vs episode).
     """
     media_type: str = 'movie' if is_movie else 'episode'
-    collection = None
-
-    # Check if collection exists and retrieve it
-    for col in plex.library.section(LIBRARY_NAME).collections():
-        if col.title == collection_name:
-            collection = col
-            break
+    section: LibrarySection = get_section(LIBRARY_NAME)
 
-    # Create collection if it doesn't exist
-    if collection is None:
+    # Look the collection up by title, creating it if it doesn't exist
+    try:
+        collection = section.collection(collection_name)
+    except NotFound:
         log_action(app.logger, "create_collection", collection=collection_name, media=media.title, media_type=media_type)
-        collection = plex.library.section(LIBRARY_NAME).createCollection(title=collection_name, items=[media])
+        collection = section.createCollection(title=collection_name, items=[media])
         collection.sortUpdate(sort="custom")
         return
 
+    # Fetch the items once and compare by rating key rather than object equality
+    items = collection.items()
+    existing_keys: set[int] = {item.ratingKey for item in items}
+
     # Add media to collection if not present
-    if media not in collection.items():
+    if media.ratingKey not in existing_keys:
+        # Plex appends added items, so a move is still needed to put it first
         collection.addItems([media])
         collection.moveItem(media, after=None)
+        items = [media, *items]
         log_action(
             app.logger, "add_to_collection",
             media=media.title, media_type=media_type,
@@ -108,13 +194,10 @@ def manage_collection(
             collection=collection_name, reason="already in collection"
         )
 
-    # Check if the collection size exceeds the maximum allowed
-    current_size = len(collection.items())
-    if current_size >= MAX_COLLECTION_SIZE:
-        items = collection.items()
-        num_items_to_remove: int = current_size - MAX_COLLECTION_SIZE
-        items_to_remove = items[-num_items_to_remove:]
-
+    # Remove everything past the maximum size in a single call
+    items_to_remove = items[cfg.max_collection_size:]
+    if items_to_remove:
+        num_items_to_remove: int = len(items_to_remove)
         removed_titles = [item.title for item in items_to_remove]  # type: ignore[misc]
         collection.removeItems(items_to_remove)
 
@@ -122,43 +205,118 @@ def manage_collection(
             app.logger, "trim_collection",
             collection=collection_name,
             removed_count=num_items_to_remove,
-            new_size=MAX_COLLECTION_SIZE,
+            new_size=cfg.max_collection_size,
             removed_items=", ".join(removed_titles[:3]) + ("..." if len(removed_titles) > 3 else "")
         )
 
 
-def trim_file(file_path: str, max_entries: int) -> None:
-    """Trim a file to keep only the last N entries.
+# File recording IDs of dubbed media deleted for an upgrade
+_DELETED_IDS_PATH: str = "/tmp/deleted_media_ids.txt"
+# Maximum number of deleted media IDs to remember
+_MAX_DELETED_IDS: int = 100
+
+
+def _load_deleted_ids(file_path: str) -> deque[int]:
+    """Read the most recently recorded media IDs from a file.
+
+    Args:
+        file_path: Path to the file of IDs, one per line, oldest first.
+
+    Returns:
+        Up to _MAX_DELETED_IDS unique IDs, oldest first; empty if the file does not exist.
+    """
+    try:
+        with open(file_path, "r") as file:
+            ids: dict[int, None] = dict.fromkeys(int(line) for line in file if line.strip().isdigit())
+    except FileNotFoundError:
+        ids = {}
+    return deque(ids, maxlen=_MAX_DELETED_IDS)
+
+
+def _write_ids(file_path: str, media_ids: Iterable[int]) -> None:
+    """Replace a file with the given IDs, one per line.
+
+    The contents are written to a temporary file and swapped in with
+    os.replace, so a crash mid-write never leaves a truncated file behind.
 
     Args:
-        file_path: Path to the file to trim.
-        max_entries: Maximum number of entries to keep.
+        file_path: Path to the file to replace.
+        media_ids: IDs to write, oldest first.
     """
-    with open(file_path, "r+") as file:
-        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
-        lines: list[str] = file.readlines()
-        if len(lines) > max_entries:
-            file.seek(0)
-            file.truncate()
-            file.writelines(lines[-max_entries:])  # Keep only the last max_entries
-        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    tmp_path: str = f"{file_path}.tmp"
+    with open(tmp_path, "w") as file:
+        file.write("".join(f"{media_id}\n" for media_id in media_ids))
+    os.replace(tmp_path, file_path)
+
+
+def _append_id(file_path: str, media_id: int) -> None:
+    """Append an ID to a file with a single O_APPEND write.
+
+    No file lock is taken: the file is only written by this process, whose
+    writers are serialized by _deleted_ids_lock. It is not safe to share
+    between several worker processes, which would each keep their own set
+    and overwrite each other's IDs on eviction, so the server runs with -w 1.
+
+    Args:
+        file_path: Path to the file to append to; created if missing.
+        media_id: ID to append.
+    """
+    fd: int = os.open(file_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, f"{media_id}\n".encode())
+    finally:
+        os.close(fd)
+
+
+# In-memory copy of the deleted IDs file: the deque keeps insertion order and
+# evicts the oldest ID, the set mirrors it for lookups
+_deleted_ids_order: deque[int] = _load_deleted_ids(_DELETED_IDS_PATH)
+_deleted_ids: set[int] = set(_deleted_ids_order)
+_deleted_ids_lock = threading.Lock()
 
 
 def handle_deletion_event(media_id: int) -> None:
     """Record a media deletion event to prevent re-adding on upgrade.
 
+    New IDs are appended to the file; it is only rewritten when the oldest
+    ID has to be evicted to stay within _MAX_DELETED_IDS.
+
     Args:
         media_id: ID of the deleted media.
     """
-    with open("/tmp/deleted_media_ids.txt", "a+") as file:
-        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
-        file.seek(0)  # Go to the beginning of the file
-        if str(media_id) not in file.read():
-            file.write(f"{media_id}\n")
-            log_action(app.logger, "record_deletion", media_id=media_id, status="recorded")
-        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    with _deleted_ids_lock:
+        if media_id in _deleted_ids:
+            return
+
+        evicting: bool = len(_deleted_ids_order) == _deleted_ids_order.maxlen
+        if evicting:
+            _deleted_ids.discard(_deleted_ids_order[0])
+        _deleted_ids_order.append(media_id)
+        _deleted_ids.add(media_id)
+
+        if evicting:
+            _write_ids(_DELETED_IDS_PATH, _deleted_ids_order)
+        else:
+            _append_id(_DELETED_IDS_PATH, media_id)
+
+    log_action(app.logger, "record_deletion", media_id=media_id, status="recorded")
+
+
+_EPOCH: datetime.date = datetime.date(1970, 1, 1)
+_SECONDS_PER_DAY: int = 86400
+
 
-    trim_file("/tmp/deleted_media_ids.txt", 100)  # Limit to 100 entries
+@functools.lru_cache(maxsize=1)
+def _utc_date(day_number: int) -> datetime.date:
+    """Return the UTC date a number of days after the Unix epoch.
+
+    Args:
+        day_number: Whole days since 1970-01-01, e.g. ``int(time.time()) // 86400``.
+
+    Returns:
+        The corresponding date, cached until the day changes.
+    """
+    return _EPOCH + datetime.timedelta(days=day_number)
 
 
 def is_recent_or_upcoming_release(date_str: str | None) -> bool:
@@ -174,14 +332,14 @@ def is_recent_or_upcoming_release(date_str: str | None) -> bool:
         return False
 
     try:
-        release_or_air_date: datetime.date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
+        release_or_air_date: datetime.date = datetime.date.fromisoformat(date_str)
     except ValueError:
         log_warning(app.logger, "Invalid date format", date=date_str)
         return False
 
-    current_date: datetime.date = datetime.datetime.now(datetime.UTC).date()
+    current_date: datetime.date = _utc_date(int(time.time()) // _SECONDS_PER_DAY)
     days_diff: int = (current_date - release_or_air_date).days
-    return 0 <= days_diff <= MAX_DATE_DIFF or release_or_air_date > current_date
+    return 0 <= days_diff <= cfg.max_date_diff or release_or_air_date > current_date
 
 
 def was_media_deleted(media_id: int) -> bool:
@@ -193,12 +351,5 @@ def was_media_deleted(media_id: int) -> bool:
     Returns:
         True if the media was previously deleted, False otherwise.
     """
-    try:
-        with open("/tmp/deleted_media_ids.txt", "r") as file:
-            fcntl.flock(file.fileno(), fcntl.LOCK_SH)
-            deleted_ids: list[str] = file.read().splitlines()
-            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
-
-        return str(media_id) in deleted_ids
-    except FileNotFoundError:
-        return False
+    with _deleted_ids_lock:
+        return media_id in _deleted_ids
@@ -4,13 +4,14 @@ from __future__ import annotations
 
 from typing import Any
 import time
-import threading
+import asyncio
 
-from flask import Request
+import orjson
+from quart import Request
 from plexapi.exceptions import NotFound  # type: ignore[import-untyped]
 from plexapi.video import Episode, Show  # type: ignore[import-untyped]
 
-from .config import app, plex, SONARR_LIBRARY
+from .config import app, cfg, ensure_plex, get_section
 from .logger import log_event, log_action, log_error
 from .shared import (
     is_english_dubbed,
@@ -22,6 +23,24 @@ from .shared import (
 )
 
 
+# Cap in seconds for a single wait between Plex lookup attempts
+MAX_LOOKUP_DELAY: int = 30
+
+
+def _backoff(delay: int, attempt: int) -> int:
+    """Return the wait before the next lookup attempt.
+
+    Args:
+        delay: Wait in seconds after the first failed attempt.
+        attempt: Number of attempts made so far (1 or more).
+
+    Returns:
+        Delay doubled for each earlier attempt, capped at MAX_LOOKUP_DELAY.
+    """
+    factor: int = 2 ** (attempt - 1)  # Annotated, since mypy types int ** int as Any
+    return min(delay * factor, MAX_LOOKUP_DELAY)
+
+
 def get_episode_from_data(
     LIBRARY_NAME: str,
     show_name: str,
@@ -38,13 +57,13 @@ def get_episode_from_data(
         season_number: Season number.
         episode_number: Episode number.
         max_retries: Maximum number of retry attempts.
-        delay: Delay in seconds between retries.
+        delay: Delay in seconds before the first retry; doubles for each later one.
 
     Returns:
         Episode object if found, None otherwise.
     """
     log_action(app.logger, "fetch_show", show=show_name, library=LIBRARY_NAME, status="searching")
-    library_section = plex.library.section(LIBRARY_NAME)  # type: ignore[no-untyped-call]
+    library_section = get_section(LIBRARY_NAME)
     retries: int = 0
     show: Show | None = None
 
@@ -61,12 +80,12 @@ def get_episode_from_data(
                 show = exact_match
                 log_action(app.logger, "fetch_show", show=show.title, status="found", match_type="exact")
                 break
-
-            time.sleep(delay)
         except NotFound:
-            time.sleep(delay)
+            pass
 
         retries += 1
+        if retries < max_retries:
+            time.sleep(_backoff(delay, retries))
 
     # Fallback to fuzzy matching
     if not show:
@@ -87,7 +106,8 @@ def get_episode_from_data(
             log_action(app.logger, "fetch_episode", episode=episode.title, status="found")
             return episode
         except NotFound:
-            time.sleep(delay)
+            if retries + 1 < max_retries:
+                time.sleep(_backoff(delay, retries + 1))
         except Exception as e:
             log_error(app.logger, "Error fetching episode", exception=str(e), season=season_number, episode=episode_number)
         retries += 1
@@ -99,7 +119,13 @@ def get_episode_from_data(
     return None
 
 
-def sonarr_handle_download_event(
+# Cap on episodes processed at once, so a season import (whose episode lookups
+# can sleep between retries) cannot occupy every worker thread
+MAX_CONCURRENT_DOWNLOADS: int = 4
+_download_slots = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+
+
+async def sonarr_handle_download_event(
     LIBRARY_NAME: str,
     show_name: str,
     season_number: int,
@@ -107,6 +133,10 @@ def sonarr_handle_download_event(
 ) -> None:
     """Handle a download event from Sonarr.
 
+    Plex calls (and the retry sleeps between them) are blocking, so they are
+    run in worker threads to keep the event loop free for incoming webhooks.
+    At most MAX_CONCURRENT_DOWNLOADS events are processed at a time.
+
     Args:
         LIBRARY_NAME: Name of the Plex library section.
         show_name: Name of the show.
@@ -114,16 +144,18 @@ def sonarr_handle_download_event(
         episode_number: Episode number.
     """
     try:
-        episode: Episode | None = get_episode_from_data(
-            LIBRARY_NAME, show_name, season_number, episode_number, max_retries=3, delay=10
-        )
-        if episode:
-            manage_collection(LIBRARY_NAME, episode)
+        async with _download_slots:
+            episode: Episode | None = await asyncio.to_thread(
+                get_episode_from_data,
+                LIBRARY_NAME, show_name, season_number, episode_number, max_retries=3, delay=10
+            )
+            if episode:
+                await asyncio.to_thread(manage_collection, LIBRARY_NAME, episode)
     except Exception as e:
         log_error(app.logger, "Error processing download event", exception=str(e), library=LIBRARY_NAME)
 
 
-def process_download_event(
+async def process_download_event(
     library_name: str,
     show_name: str,
     episode_name: str,
@@ -144,6 +176,9 @@ def process_download_event(
         episode_number: Episode number.
         is_upgrade: Whether this is an upgrade.
         is_recent_release: Whether this is a recent release.
+
+    Raises:
+        PlexNotReady: If Plex cannot be reached, so the webhook is answered with 503.
     """
     if is_upgrade:
         log_action(
@@ -163,10 +198,11 @@ def process_download_event(
         )
         return
 
-    threading.Thread(
-        target=sonarr_handle_download_event,
-        args=(library_name, show_name, season_number, episode_number)
-    ).start()
+    await ensure_plex()
+    app.add_background_task(
+        sonarr_handle_download_event,
+        library_name, show_name, season_number, episode_number
+    )
 
 
 def sonarr_log_webhook(
@@ -208,23 +244,46 @@ def sonarr_log_webhook(
     )
 
 
-def sonarr_webhook(request: Request) -> tuple[str, int]:
+# Event types that can add to or protect the collection; all others are ignored
+_ACTIONABLE_EVENTS: frozenset[str] = frozenset({'Download', 'EpisodeFileDelete'})
+
+
+async def sonarr_webhook(request: Request) -> tuple[str, int]:
     """Handle incoming Sonarr webhook requests.
 
     Args:
-        request: Flask request object.
+        request: Quart request object.
 
     Returns:
         Tuple of (response message, status code).
     """
-    data: dict[str, Any] = request.get_json()
+    try:
+        data: dict[str, Any] = orjson.loads(await request.get_data(cache=False))
+    except orjson.JSONDecodeError as e:
+        log_error(app.logger, "Invalid webhook payload", source="sonarr", exception=str(e))
+        return "Invalid JSON", 400
+    if not isinstance(data, dict):
+        log_error(app.logger, "Invalid webhook payload", source="sonarr", exception=f"expected an object, got {type(data).__name__}")
+        return "Invalid JSON", 400
+
     event_type: str = data.get('eventType', '')
-    show_name: str = data.get('series', {}).get('title', '')
-    episode_name: str = data.get('episodes', [{}])[0].get('title', '')
-    episode_id: int = data.get('episodes', [{}])[0].get('id', 0)
-    season_number: int = data.get('episodes', [{}])[0].get('seasonNumber', 0)
-    episode_number: int = data.get('episodes', [{}])[0].get('episodeNumber', 0)
-    air_date: str | None = data.get('episodes', [{}])[0].get('airDate')
+    if event_type not in _ACTIONABLE_EVENTS:
+        log_action(app.logger, "skip_episode", reason="event not handled", event=event_type)
+        return "Webhook received", 200
+
+    show_name: str = (data.get('series') or {}).get('title', '')
+    episode: dict[str, Any] = (data.get('episodes') or [{}])[0]
+    episode_name: str = episode.get('title', '')
+    episode_id: int = episode.get('id', 0)
+    season_number: int = episode.get('seasonNumber', 0)
+    episode_number: int = episode.get('episodeNumber', 0)
+    air_date: str | None = episode.get('airDate')
+
+    # Skip re-downloads of episodes deleted for an upgrade before any further parsing
+    if event_type == 'Download' and was_media_deleted(episode_id):
+        log_action(app.logger, "skip_episode", reason="previous upgrade of dubbed episode", episode_id=episode_id)
+        return "Webhook received", 200
+
     is_dubbed: bool = is_english_dubbed(data)
     is_upgrade: bool = data.get('isUpgrade', False)
 
@@ -237,11 +296,9 @@ def sonarr_webhook(request: Request) -> tuple[str, int]:
 
     if event_type == 'EpisodeFileDelete' and data.get('deleteReason') == 'upgrade' and is_dubbed:
         handle_deletion_event(episode_id)
-    elif was_media_deleted(episode_id):
-        log_action(app.logger, "skip_episode", reason="previous upgrade of dubbed episode", episode_id=episode_id)
-    elif event_type == 'Download' and is_dubbed and SONARR_LIBRARY:
-        process_download_event(
-            SONARR_LIBRARY, show_name, episode_name, episode_id,
+    elif event_type == 'Download' and is_dubbed and cfg.sonarr_library:
+        await process_download_event(
+            cfg.sonarr_library, show_name, episode_name, episode_id,
             season_number, episode_number, is_upgrade, is_recent_release
         )
     else: